@@ -9,37 +9,170 @@ Google Maps Scraper V5 - With Opening Hours Fix
 import os
 import sys
 import csv
+import io
 import json
+import logging
+import logging.handlers
 import time
 import random
+import shutil
+import signal
+import tempfile
 import urllib.parse
+from multiprocessing import Pool, Queue, active_children
+from multiprocessing.util import Finalize
 import re
-from typing import Optional, List, Tuple
-from datetime import datetime
+import functools
+import glob
+import itertools
+from typing import Optional, List, Tuple, TYPE_CHECKING
+from datetime import datetime, timedelta
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
-from bs4 import BeautifulSoup
-from fuzzywuzzy import fuzz
-from unidecode import unidecode
+from selenium.common.exceptions import TimeoutException
+import lxml.html
 
-# Fix encoding on Windows
+# bs4, rapidfuzz, unidecode import lazy trong hàm dùng tới - giảm RSS mỗi worker
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
+
+# pyahocorasick (optional): quét tất cả chuỗi cố định trong 1 lượt O(len(text))
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# psutil (optional): đo RSS của Chrome cho watchdog restart driver
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# Fix encoding on Windows - stdout buffer thường thay vì flush sau mỗi lần write
 if sys.platform == 'win32':
-    import codecs
-    sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'strict')
-    sys.stderr = codecs.getwriter('utf-8')(sys.stderr.buffer, 'strict')
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', write_through=False, line_buffering=False)
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', write_through=False, line_buffering=False)
+
+# Status từng place đi qua logger. Trong scrape_csv_file: QueueHandler -> QueueListener
+# ở process chính, file log nhận tất cả, console chỉ WARNING trở lên.
+# Dùng GoogleMapsScraper trực tiếp: handler mặc định in hết ra stdout như trước
+logger = logging.getLogger("scraper")
+_default_log_handler = logging.StreamHandler(sys.stdout)
+_default_log_handler.setFormatter(logging.Formatter('%(message)s'))
+logger.addHandler(_default_log_handler)
+logger.setLevel(logging.INFO)
+logger.propagate = False
+
+
+# Chuỗi cố định KHÔNG hợp lệ trong địa chỉ (rating, category, directions bị lẫn vào)
+# So khớp không phân biệt hoa thường
+_INVALID_ADDR_LITERALS = [
+    '·',                         # Google separator
+    'Điểm thu hút',
+    'Điểm mốc',
+    'Đường đi',
+    'Mở cửa',
+    'Đóng cửa',
+    'Sắp đóng',
+    'Sắp mở',
+    'Khách sạn nghỉ',
+    'Bể bơi',
+    'Wi-Fi',
+    'Được tài trợ',
+    'Của Agoda',
+    'Booking.com',
+    'Đại lý du lịch',
+    'Công viên xe',
+    'Phòng cho thuê',
+]
+
+# Pattern KHÔNG hợp lệ cần regex thật sự
+_INVALID_ADDR_PATTERNS = [
+    r'\d+[,.]?\d*\s*\(\d',      # 4,1(903 - rating
+    r'\bsao\b',
+    r'\bstar\b',
+]
+
+# Regex compile 1 lần khi load module
+# Dùng re (không dùng re2): \b, \d của re2 chỉ hiểu ASCII, sai với chữ có dấu
+_INVALID_ADDR_RE = re.compile("|".join(_INVALID_ADDR_PATTERNS), re.IGNORECASE)
+_DIGIT_RE = re.compile(r'\d')
+_INT_RE = re.compile(r'(\d+)')
+_CHI_NHANH_RE = re.compile(r'\s*-\s*chi nhanh.*$', re.IGNORECASE)
+_BRANCH_RE = re.compile(r'\s*-\s*branch.*$', re.IGNORECASE)
+_PUNCT_RE = re.compile(r'[^\w\s]')
+_PLACE_URL_RE = re.compile(r'/place/([^/@]+)')
+_PLACE_PAGE_URL_RE = re.compile(r'/place/[^/]+/@')   # URL đã là trang chi tiết 1 place
+_URL_Q_RE = re.compile(r'[?&]q=([^&]+)')
+_PHONE_RE = re.compile(r'[\d\s\-\+\(\)]{8,}')
+_PRICE_RE = re.compile(r'^[\$₫]{1,4}$')
+_RATING_SAO_RE = re.compile(r'(\d+[,.]?\d*)\s*sao')
+_DANH_GIA_RE = re.compile(r'(\d+[\.,]?\d*)\s*đánh giá')
+_STAR_RE = re.compile(r'(\d+[,.]?\d*)\s*star')
+_REVIEW_RE = re.compile(r'(\d+[\.,]?\d*)\s*review')
+_RATING_NUM_RE = re.compile(r'^\d+[,.]?\d*$')
+_BTN_COUNT_RE = re.compile(r'\((\d{1,3}(?:[,\.]\d{3})*)\)')
+_IMG_SIZE_RE = re.compile(r'=w(\d+)')
+
+# Score (rapidfuzz WRatio) đủ chắc để nhận luôn kết quả đầu tiên khi chọn chi nhánh
+_CONFIDENT_MATCH_SCORE = 90
+
+# Prefix của feature trong tab About - 1 lần match thay cho chuỗi startswith
+# yes/no: bỏ prefix, chuẩn hóa thành "Có: "/"Không: "
+_FEATURE_RE = re.compile(
+    r"(?P<yes>Có: |Có |Chấp nhận |Yes: |Has |Accepts )"
+    r"|(?P<no>Không: |Không |No: |No |Doesn't have )"
+)
+# Feature không có prefix: giữ nguyên, thêm "Có: "
+_BARE_POS_PREFIXES = (
+    "Phù hợp ", "Thích hợp ", "Good for ",
+    "Picnic", "Wifi", "Toilet", "Restroom", "Parking", "Wheelchair",
+)
+
+# Bảng bỏ dấu tiếng Việt cho str.translate (chạy ở tốc độ C, thay cho unidecode)
+_VI_ACCENTED = (
+    "àáảãạăằắẳẵặâầấẩẫậèéẻẽẹêềếểễệìíỉĩịòóỏõọôồốổỗộơờớởỡợùúủũụưừứửữựỳýỷỹỵđ"
+    "ÀÁẢÃẠĂẰẮẲẴẶÂẦẤẨẪẬÈÉẺẼẸÊỀẾỂỄỆÌÍỈĨỊÒÓỎÕỌÔỒỐỔỖỘƠỜỚỞỠỢÙÚỦŨỤƯỪỨỬỮỰỲÝỶỸỴĐ"
+)
+_VI_PLAIN = (
+    "aaaaaaaaaaaaaaaaaeeeeeeeeeeeiiiiiooooooooooooooooouuuuuuuuuuuyyyyyd"
+    "AAAAAAAAAAAAAAAAAEEEEEEEEEEEIIIIIOOOOOOOOOOOOOOOOOUUUUUUUUUUUYYYYYD"
+)
+_VI_TRANSLATE = str.maketrans(_VI_ACCENTED, _VI_PLAIN)
+
+
+_INVALID_ADDR_LITERALS_LOWER = [w.lower() for w in _INVALID_ADDR_LITERALS]
+
+if ahocorasick is not None:
+    _INVALID_ADDR_AUTOMATON = ahocorasick.Automaton()
+    for _word in _INVALID_ADDR_LITERALS_LOWER:
+        _INVALID_ADDR_AUTOMATON.add_word(_word, _word)
+    _INVALID_ADDR_AUTOMATON.make_automaton()
+else:
+    _INVALID_ADDR_AUTOMATON = None
+
+
+def _has_invalid_literal(addr_lower: str) -> bool:
+    if _INVALID_ADDR_AUTOMATON is not None:
+        return next(_INVALID_ADDR_AUTOMATON.iter(addr_lower), None) is not None
+    return any(w in addr_lower for w in _INVALID_ADDR_LITERALS_LOWER)
 
 
 def normalize_place_name(name: str) -> str:
     if not name:
         return ""
     name = name.lower()
-    name = unidecode(name)
-    name = re.sub(r'\s*-\s*chi nhanh.*$', '', name, flags=re.IGNORECASE)
-    name = re.sub(r'\s*-\s*branch.*$', '', name, flags=re.IGNORECASE)
-    name = re.sub(r'[^\w\s]', ' ', name)
+    name = name.translate(_VI_TRANSLATE)
+    if not name.isascii():
+        # Còn ký tự ngoài bảng (dấu tổ hợp, chữ không phải tiếng Việt)
+        from unidecode import unidecode
+        name = unidecode(name)
+    name = _CHI_NHANH_RE.sub('', name)
+    name = _BRANCH_RE.sub('', name)
+    name = _PUNCT_RE.sub(' ', name)
     name = ' '.join(name.split())
     return name
 
@@ -48,7 +181,7 @@ def extract_name_from_google_maps_url(url: str) -> Optional[str]:
     if not url:
         return None
     try:
-        match = re.search(r'/place/([^/@]+)', url)
+        match = _PLACE_URL_RE.search(url)
         if match:
             encoded_name = match.group(1)
             decoded_name = urllib.parse.unquote(encoded_name)
@@ -64,35 +197,10 @@ def clean_address(addr: str) -> Optional[str]:
     if not addr or len(addr) < 5:
         return None
     
-    # Pattern KHÔNG hợp lệ
-    invalid_patterns = [
-        r'\d+[,.]?\d*\s*\(\d',      # 4,1(903 - rating
-        r'·',                        # Google separator
-        r'Điểm thu hút',
-        r'Điểm mốc',
-        r'Đường đi',
-        r'Mở cửa',
-        r'Đóng cửa',
-        r'Sắp đóng',
-        r'Sắp mở',
-        r'\bsao\b',
-        r'\bstar\b',
-        r'Khách sạn nghỉ',
-        r'Bể bơi',
-        r'Wi-Fi',
-        r'Được tài trợ',
-        r'Của Agoda',
-        r'Booking\.com',
-        r'Đại lý du lịch',
-        r'Công viên xe',
-        r'Phòng cho thuê',
-    ]
-    
-    for pattern in invalid_patterns:
-        if re.search(pattern, addr, re.IGNORECASE):
-            return None
+    if _has_invalid_literal(addr.lower()) or _INVALID_ADDR_RE.search(addr):
+        return None
     
-    addr = re.sub(r'\s+', ' ', addr).strip()
+    addr = ' '.join(addr.split())
     
     # Validate
     valid_keywords = [
@@ -104,7 +212,7 @@ def clean_address(addr: str) -> Optional[str]:
     
     addr_lower = addr.lower()
     has_valid = any(kw in addr_lower for kw in valid_keywords)
-    has_number = bool(re.search(r'\d', addr))
+    has_number = bool(_DIGIT_RE.search(addr))
     
     if has_valid or (has_number and len(addr) > 15):
         return addr
@@ -118,7 +226,7 @@ def clean_website_url(url: str) -> Optional[str]:
     
     if "google.com/url" in url and "?q=" in url:
         try:
-            match = re.search(r'[?&]q=([^&]+)', url)
+            match = _URL_Q_RE.search(url)
             if match:
                 return urllib.parse.unquote(match.group(1))
         except:
@@ -130,21 +238,219 @@ def clean_website_url(url: str) -> Optional[str]:
     return url
 
 
+@functools.lru_cache(maxsize=512)
+def _relative_to_date(text: str, today) -> Optional[str]:
+    """Cache theo (text, ngày) - chuỗi thời gian tương đối chỉ có vài chục giá trị khác nhau"""
+    try:
+        num_match = _INT_RE.search(text)
+        num = int(num_match.group(1)) if num_match else 1
+        
+        if any(x in text for x in ['day', 'ngày', 'ngay']):
+            date = today - timedelta(days=num)
+        elif any(x in text for x in ['week', 'tuần', 'tuan']):
+            date = today - timedelta(weeks=num)
+        elif any(x in text for x in ['month', 'tháng', 'thang']):
+            date = today - timedelta(days=num * 30)
+        elif any(x in text for x in ['year', 'năm', 'nam']):
+            date = today - timedelta(days=num * 365)
+        else:
+            return None
+        
+        return date.strftime("%d/%m/%Y")
+    except:
+        return None
+
+
+# Tên ngày theo locale -> key chuẩn của opening_hours
+_DAY_ALIASES = {
+    "Thứ Hai": ["thứ hai", "thứ 2", "t2", "monday", "mon"],
+    "Thứ Ba": ["thứ ba", "thứ 3", "t3", "tuesday", "tue"],
+    "Thứ Tư": ["thứ tư", "thứ 4", "t4", "wednesday", "wed"],
+    "Thứ Năm": ["thứ năm", "thứ 5", "t5", "thursday", "thu"],
+    "Thứ Sáu": ["thứ sáu", "thứ 6", "t6", "friday", "fri"],
+    "Thứ Bảy": ["thứ bảy", "thứ bẩy", "thứ 7", "t7", "saturday", "sat"],
+    "Chủ Nhật": ["chủ nhật", "cn", "sunday", "sun"],
+}
+_DAY_CANON = {alias: canon for canon, aliases in _DAY_ALIASES.items() for alias in aliases}
+
+
+@functools.cache
+def _canon_day(name: str) -> str:
+    """'Thứ 2' / 'Monday' -> 'Thứ Hai'; tên không nhận ra thì giữ nguyên"""
+    return _DAY_CANON.get(' '.join(name.lower().split()), name)
+
+
+def _pick_best_candidate(query_norm: str, hrefs: List[str], min_score: float = 50) -> Optional[int]:
+    """Index của kết quả có tên khớp query nhất (score >= min_score), None nếu không có"""
+    from rapidfuzz import fuzz, process
+    candidates = {}
+    for i, href in enumerate(hrefs):
+        cand = extract_name_from_google_maps_url(href)
+        if cand:
+            candidates[i] = normalize_place_name(cand)
+    if not candidates:
+        return None
+    # Kết quả đầu tiên đã khớp chắc chắn -> không cần chấm các kết quả còn lại
+    first = next(iter(candidates))
+    if fuzz.WRatio(query_norm, candidates[first]) >= _CONFIDENT_MATCH_SCORE:
+        return first
+    best = process.extractOne(query_norm, candidates, scorer=fuzz.WRatio, score_cutoff=min_score)
+    return best[2] if best else None
+
+
+def _clean_hours_text(hours_text: str) -> str:
+    """Clean format: '08:00 đến 17:00' -> '08:00-17:00'"""
+    hours_text = hours_text.replace(' đến ', '-').replace('đến', '-')
+    return hours_text.replace('–', '-')  # en-dash -> hyphen
+
+
+def convert_relative_date(relative_time: str) -> Optional[str]:
+    """Convert '3 tháng trước' -> '03/09/2024'"""
+    if not relative_time:
+        return None
+    return _relative_to_date(relative_time.lower(), datetime.now().date())
+
+# JS lấy tất cả field trên trang chính trong 1 lần execute_script.
+# Trả về giá trị thô cho từng strategy, phần xử lý nằm ở các _get_* (Python).
+_EXTRACT_BASIC_JS = """
+return (function () {
+    const all = (sel) => Array.from(document.querySelectorAll(sel));
+    const attrs = (sel, name) => all(sel).map(e => e.getAttribute(name) || '');
+    const texts = (sel) => all(sel).map(e => e.textContent.trim());
+    const first = (sel, name) => {
+        const e = document.querySelector(sel);
+        return e ? e.getAttribute(name) : null;
+    };
+    const buttonArias = attrs("button[aria-label]", 'aria-label');
+    const out = {};
+
+    out.address = first("button[data-item-id='address']", 'aria-label');
+    out.address_arias = buttonArias.filter(a => a.startsWith('Địa chỉ:') || a.startsWith('Address:'));
+    out.address_texts = all("button[data-item-id]")
+        .filter(b => b.getAttribute('data-item-id').toLowerCase().includes('address'))
+        .map(b => b.querySelector("div[class*='Io6YTe']"))
+        .filter(d => d)
+        .map(d => d.textContent.trim());
+
+    out.phone_ids = attrs("button[data-item-id^='phone:tel:']", 'data-item-id');
+    out.phone_arias = buttonArias.filter(a => a.includes('Điện thoại:') || a.includes('Phone:'));
+    out.tel_hrefs = attrs("a[href^='tel:']", 'href');
+
+    const authority = document.querySelector("a[data-item-id='authority']");
+    out.website = authority ? authority.href : null;
+    out.website_links = all("a[aria-label*='website'], a[aria-label*='Trang web']").map(a => a.href);
+
+    out.price_arias = attrs("span[aria-label*='Price'], span[aria-label*='Giá']", 'aria-label');
+    out.price_texts = texts("span").filter(t => /^[$₫]{1,4}$/.test(t));
+
+    out.rating_sao = first("span[aria-label*='sao']", 'aria-label');
+    out.rating_star = first("span[aria-label*='star']", 'aria-label');
+    out.rating_big = texts("div.fontDisplayLarge");
+    out.count_texts = all("button").map(b => b.textContent).filter(t => t.includes('('));
+
+    out.category = texts("button[jsaction*='category']");
+    const dk = document.querySelector("button.DkEaL");
+    out.category_alt = dk ? dk.textContent.trim() : null;
+
+    // Bảng giờ mở cửa nếu đã có trong DOM: [[ngày, giờ], ...]
+    out.hours = all("table.eK4R0e tr.y0skZc").map(r => {
+        const day = r.querySelector("td.ylH6lf");
+        const td = r.querySelector("td.mxowUb");
+        if (!day || !td) return null;
+        const li = td.querySelector("li.G8aQO");
+        const text = td.getAttribute('aria-label') || (li ? li.textContent.trim() : '') || td.textContent.trim();
+        return [day.textContent.trim(), text];
+    }).filter(r => r);
+
+    return out;
+})();
+"""
+
+
+# href của N kết quả đầu trong danh sách tìm kiếm. arguments: [N]
+_PLACE_HREFS_JS = """
+return Array.from(document.querySelectorAll("a[href*='/place/']"))
+    .slice(0, arguments[0])
+    .map(a => a.href);
+"""
+
+_OUTER_HTML_JS = """
+const el = document.querySelector(arguments[0]);
+return el ? el.outerHTML : null;
+"""
+
+# Panel của place đang mở: div[role='main'] có thanh tab (khi mở từ danh sách kết quả,
+# panel kết quả vẫn nằm trong DOM, đứng trước panel place)
+_PLACE_PANEL_HTML_JS = """
+const mains = Array.from(document.querySelectorAll("div[role='main']"));
+const panel = mains.filter(e => e.querySelector("button[role='tab']")).pop() || mains.pop();
+return panel ? panel.outerHTML : null;
+"""
+
+# Async script: scroll mỗi 200ms, callback khi tổng scrollHeight đứng yên hoặc hết timeout.
+# arguments: [css selector, timeout ms, callback]
+_SCROLL_TO_END_JS = """
+const done = arguments[arguments.length - 1];
+const els = Array.from(document.querySelectorAll(arguments[0]));
+if (!els.length) {
+    done();
+    return;
+}
+let last = -1;
+const timer = setInterval(() => {
+    let total = 0;
+    for (const el of els) {
+        el.scrollTop = el.scrollHeight;
+        total += el.scrollHeight;
+    }
+    if (total === last) {
+        clearInterval(timer);
+        clearTimeout(guard);
+        done();
+    }
+    last = total;
+}, 200);
+const guard = setTimeout(() => {
+    clearInterval(timer);
+    done();
+}, arguments[1]);
+"""
+
+
 class GoogleMapsScraper:
     USER_AGENTS = [
         'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
         'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
     ]
 
+    # Chỉ cần DOM text/aria-label - không tải ảnh, font, analytics
+    # (_get_images đọc src của <img>, không cần tải file ảnh)
+    BLOCKED_URL_PATTERNS = [
+        '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.svg', '*.ico',
+        '*.woff', '*.woff2', '*.ttf',
+        '*googletagmanager.com*', '*google-analytics.com*', '*doubleclick.net*',
+    ]
+
+    # Số lần scroll tối đa trong tab ảnh (dừng sớm khi đủ ảnh / không load thêm)
+    MAX_IMAGE_SCROLLS = 10
+
+    # Watchdog: Chrome phình RAM dần trong phiên dài -> restart sau N place hoặc khi vượt RSS
+    RESTART_EVERY = 100
+    MAX_RSS_BYTES = 2_000_000_000
+
     def __init__(self, headless: bool = True):
         self.headless = headless
         self.driver = None
+        self.places_since_restart = 0
+        self.cache_dir = None
 
     def init_driver(self):
         if self.driver:
             return
 
         chrome_options = Options()
+        # driver.get trả về ngay khi DOMContentLoaded - phần còn lại đã có WebDriverWait lo
+        chrome_options.page_load_strategy = 'eager'
         if self.headless:
             chrome_options.add_argument('--headless=new')
         chrome_options.add_argument('--no-sandbox')
@@ -153,137 +459,163 @@ class GoogleMapsScraper:
         chrome_options.add_argument('--window-size=1920,1080')
         chrome_options.add_argument(f'--user-agent={random.choice(self.USER_AGENTS)}')
         chrome_options.add_argument('--lang=vi')
-        chrome_options.add_experimental_option('prefs', {'intl.accept_languages': 'vi,en'})
+        chrome_options.add_argument('--blink-settings=imagesEnabled=false')
+        # Tắt các subsystem không dùng tới (extension, sync, dịch trang, first-run...)
+        chrome_options.add_argument('--disable-extensions')
+        chrome_options.add_argument('--disable-background-networking')
+        chrome_options.add_argument('--disable-sync')
+        chrome_options.add_argument('--disable-default-apps')
+        chrome_options.add_argument('--disable-translate')
+        chrome_options.add_argument('--no-first-run')
+        chrome_options.add_argument('--no-default-browser-check')
+        chrome_options.add_argument('--disable-features=Translate,BackForwardCache,MediaRouter,InterestFeedContentSuggestions')
+        # Disk cache riêng của scraper này, dùng lại qua các lần restart driver (watchdog):
+        # JS/CSS bundle của Maps không phải tải lại. Profile vẫn để chromedriver tạo mới mỗi
+        # session (Chrome chết không nhả lock thì session sau vẫn chạy được).
+        # Xoá trong shutdown() khi scraper không dùng nữa
+        if self.cache_dir is None:
+            self.cache_dir = tempfile.mkdtemp(prefix=_cache_dir_prefix(os.getpid()))
+        chrome_options.add_argument(f'--disk-cache-dir={self.cache_dir}')
+        chrome_options.add_argument('--disk-cache-size=536870912')
+        chrome_options.add_experimental_option('prefs', {
+            'intl.accept_languages': 'vi,en',
+            'profile.managed_default_content_settings.images': 2,
+            'profile.default_content_setting_values.notifications': 2,
+        })
 
-        self.driver = webdriver.Chrome(options=chrome_options)
+        # keep_alive: dùng lại 1 kết nối HTTP tới chromedriver cho mọi command
+        self.driver = webdriver.Chrome(options=chrome_options, keep_alive=True)
         self.driver.set_page_load_timeout(30)
-        print("[OK] WebDriver initialized")
+        # Chỉ dùng WebDriverWait - implicit wait sẽ cộng dồn vào mỗi find_element trong until()
+        self.driver.implicitly_wait(0)
+        self.places_since_restart = 0
+        try:
+            self.driver.execute_cdp_cmd('Network.enable', {})
+            self.driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': self.BLOCKED_URL_PATTERNS})
+        except Exception as e:
+            logger.warning(f"[WARNING] Block URLs error: {e}")
+        logger.info("[OK] WebDriver initialized")
 
-    def _get_address(self) -> Optional[str]:
-        """Lấy địa chỉ - CHỈ từ nguồn đáng tin"""
-        
-        # Strategy 1: data-item-id='address'
+    def _wait_for(self, css: str, timeout: float) -> bool:
+        """Đợi tới khi có element khớp css (tối đa timeout giây) - thay cho sleep cố định"""
         try:
-            btn = self.driver.find_element(By.CSS_SELECTOR, "button[data-item-id='address']")
-            aria = btn.get_attribute("aria-label")
-            if aria:
-                addr = aria.replace("Địa chỉ: ", "").replace("Address: ", "").strip()
-                cleaned = clean_address(addr)
-                if cleaned:
-                    return cleaned
-        except:
-            pass
-        
-        # Strategy 2: aria-label bắt đầu "Địa chỉ:"
+            WebDriverWait(self.driver, timeout).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, css)))
+            return True
+        except TimeoutException:
+            return False
+
+    def _wait_for_place_url(self, timeout: float = 6):
+        """Sau khi click 1 kết quả: đợi URL chuyển sang trang place (/place/<tên>/@...)"""
         try:
-            buttons = self.driver.find_elements(By.CSS_SELECTOR, "button[aria-label]")
-            for btn in buttons:
-                aria = btn.get_attribute("aria-label") or ""
-                if aria.startswith("Địa chỉ:") or aria.startswith("Address:"):
-                    addr = aria.split(":", 1)[-1].strip()
-                    cleaned = clean_address(addr)
-                    if cleaned:
-                        return cleaned
-        except:
+            WebDriverWait(self.driver, timeout).until(
+                lambda d: _PLACE_PAGE_URL_RE.search(d.current_url))
+        except TimeoutException:
             pass
-        
-        # Strategy 3: Tìm div.Io6YTe trong button address
+
+    def _scroll_to_end(self, css: str, timeout_ms: int = 4000):
+        """Scroll các container khớp css tới cuối - dừng ngay khi scrollHeight không tăng nữa"""
         try:
-            soup = BeautifulSoup(self.driver.page_source, 'html.parser')
-            for btn in soup.find_all('button', attrs={'data-item-id': True}):
-                if 'address' in btn.get('data-item-id', '').lower():
-                    text_div = btn.find('div', class_=lambda x: x and 'Io6YTe' in str(x))
-                    if text_div:
-                        addr = text_div.get_text(strip=True)
-                        cleaned = clean_address(addr)
-                        if cleaned:
-                            return cleaned
+            self.driver.execute_async_script(_SCROLL_TO_END_JS, css, timeout_ms)
         except:
             pass
-        
-        return None
 
-    def _get_phone(self) -> Optional[str]:
+    def _outer_html(self, css: str) -> Optional[str]:
+        """outerHTML của element đầu tiên khớp css - chỉ serialize phần DOM cần parse"""
         try:
-            btns = self.driver.find_elements(By.CSS_SELECTOR, "button[data-item-id^='phone:tel:']")
-            for btn in btns:
-                data_id = btn.get_attribute("data-item-id")
-                if data_id and "phone:tel:" in data_id:
-                    phone = data_id.replace("phone:tel:", "").strip()
-                    if phone and len(phone) >= 8:
-                        return phone
+            return self.driver.execute_script(_OUTER_HTML_JS, css)
         except:
-            pass
-        
+            return None
+
+    def _place_panel_html(self) -> Optional[str]:
+        """outerHTML panel chi tiết của place đang mở (bỏ qua panel danh sách kết quả)"""
         try:
-            buttons = self.driver.find_elements(By.CSS_SELECTOR, "button[aria-label]")
-            for btn in buttons:
-                aria = btn.get_attribute("aria-label") or ""
-                if "Điện thoại:" in aria or "Phone:" in aria:
-                    match = re.search(r'[\d\s\-\+\(\)]{8,}', aria)
-                    if match:
-                        return match.group(0).strip()
+            return self.driver.execute_script(_PLACE_PANEL_HTML_JS)
         except:
-            pass
-        
+            return None
+
+    def _snapshot(self) -> "BeautifulSoup":
+        """Serialize DOM 1 lần và parse - dùng chung cho các _get_* trên cùng trạng thái trang"""
+        from bs4 import BeautifulSoup
+        return BeautifulSoup(self.driver.page_source, 'lxml')
+
+    def _extract_basic(self) -> dict:
+        """1 lần execute_script lấy dữ liệu thô cho tất cả field trên trang chính"""
         try:
-            links = self.driver.find_elements(By.CSS_SELECTOR, "a[href^='tel:']")
-            for link in links:
-                href = link.get_attribute("href")
-                if href:
-                    phone = href.replace("tel:", "").strip()
-                    if len(phone) >= 8:
-                        return phone
-        except:
-            pass
+            return self.driver.execute_script(_EXTRACT_BASIC_JS) or {}
+        except Exception as e:
+            logger.warning(f"[WARNING] Extract error: {e}")
+            return {}
+
+    def _get_address(self, data: dict) -> Optional[str]:
+        """Lấy địa chỉ - CHỈ từ nguồn đáng tin"""
+        
+        # Strategy 1: data-item-id='address'
+        aria = data.get("address")
+        if aria:
+            addr = aria.replace("Địa chỉ: ", "").replace("Address: ", "").strip()
+            cleaned = clean_address(addr)
+            if cleaned:
+                return cleaned
+        
+        # Strategy 2: aria-label bắt đầu "Địa chỉ:"
+        for aria in data.get("address_arias") or []:
+            addr = aria.split(":", 1)[-1].strip()
+            cleaned = clean_address(addr)
+            if cleaned:
+                return cleaned
+        
+        # Strategy 3: Tìm div.Io6YTe trong button address
+        for addr in data.get("address_texts") or []:
+            cleaned = clean_address(addr)
+            if cleaned:
+                return cleaned
         
         return None
 
-    def _get_website(self) -> Optional[str]:
-        raw_url = None
+    def _get_phone(self, data: dict) -> Optional[str]:
+        for data_id in data.get("phone_ids") or []:
+            if data_id and "phone:tel:" in data_id:
+                phone = data_id.replace("phone:tel:", "").strip()
+                if phone and len(phone) >= 8:
+                    return phone
         
-        try:
-            links = self.driver.find_elements(By.CSS_SELECTOR, "a[data-item-id='authority']")
-            if links:
-                raw_url = links[0].get_attribute("href")
-        except:
-            pass
+        for aria in data.get("phone_arias") or []:
+            match = _PHONE_RE.search(aria)
+            if match:
+                return match.group(0).strip()
+        
+        for href in data.get("tel_hrefs") or []:
+            if href:
+                phone = href.replace("tel:", "").strip()
+                if len(phone) >= 8:
+                    return phone
+        
+        return None
+
+    def _get_website(self, data: dict) -> Optional[str]:
+        raw_url = data.get("website")
         
         if not raw_url:
-            try:
-                links = self.driver.find_elements(By.CSS_SELECTOR, "a[aria-label*='website'], a[aria-label*='Trang web']")
-                for link in links:
-                    href = link.get_attribute("href")
-                    if href and not href.startswith("tel:"):
-                        raw_url = href
-                        break
-            except:
-                pass
+            for href in data.get("website_links") or []:
+                if href and not href.startswith("tel:"):
+                    raw_url = href
+                    break
         
         return clean_website_url(raw_url)
 
-    def _get_price_level(self) -> Optional[str]:
-        try:
-            spans = self.driver.find_elements(By.CSS_SELECTOR, "span[aria-label*='Price'], span[aria-label*='Giá']")
-            for span in spans:
-                aria = span.get_attribute("aria-label") or ""
-                if "đánh giá" in aria.lower():
-                    continue
-                if "Price:" in aria:
-                    return aria.split("Price:")[-1].strip()
-                if "Giá:" in aria:
-                    return aria.split("Giá:")[-1].strip()
-        except:
-            pass
+    def _get_price_level(self, data: dict) -> Optional[str]:
+        for aria in data.get("price_arias") or []:
+            if "đánh giá" in aria.lower():
+                continue
+            if "Price:" in aria:
+                return aria.split("Price:")[-1].strip()
+            if "Giá:" in aria:
+                return aria.split("Giá:")[-1].strip()
         
-        try:
-            spans = self.driver.find_elements(By.TAG_NAME, "span")
-            for span in spans:
-                text = span.text.strip()
-                if re.match(r'^[\$₫]{1,4}$', text):
-                    return text
-        except:
-            pass
+        for text in data.get("price_texts") or []:
+            if _PRICE_RE.match(text):
+                return text
         
         return None
 
@@ -303,22 +635,15 @@ class GoogleMapsScraper:
                 tab_text = tab.text.lower()
                 if any(x in tab_text for x in ["about", "giới thiệu", "thông tin"]):
                     tab.click()
-                    time.sleep(2.5)
+                    self._wait_for("div[class*='iNvpkc'], li[class*='hpLkke']", 3)
                     clicked = True
                     break
             
             if not clicked:
                 return None
             
-            # Scroll nhiều lần để load hết content
-            try:
-                scrollables = self.driver.find_elements(By.CSS_SELECTOR, "div[role='main'], div.m6QErb")
-                for scrollable in scrollables:
-                    for _ in range(5):
-                        self.driver.execute_script('arguments[0].scrollTop = arguments[0].scrollHeight', scrollable)
-                        time.sleep(0.3)
-            except:
-                pass
+            # Scroll tới khi load hết content
+            self._scroll_to_end("div[role='main'], div.m6QErb")
             
             # Helper function để parse và add feature
             def add_feature(aria: str):
@@ -329,112 +654,36 @@ class GoogleMapsScraper:
 
                 feature = None
                 
-                if aria.startswith("Có: "):
-                    feature = "Có: " + aria[4:].strip()
-                elif aria.startswith("Không: "):
-                    feature = "Không: " + aria[7:].strip()
-                elif aria.startswith("Có "):
-                    feature = "Có: " + aria[3:].strip()
-                elif aria.startswith("Không "):
-                    feature = "Không: " + aria[6:].strip()
-                elif aria.startswith("Chấp nhận "):
-                    feature = "Có: " + aria[10:].strip()
-                elif aria.startswith("Phù hợp "):
-                    feature = "Có: " + aria 
-                elif aria.startswith("Thích hợp "):
-                    feature = "Có: " + aria
-                elif aria.startswith("Yes: "):
-                    feature = "Có: " + aria[5:].strip()
-                elif aria.startswith("No: "):
-                    feature = "Không: " + aria[4:].strip()
-                elif aria.startswith("Has "):
-                    feature = "Có: " + aria[4:].strip()
-                elif aria.startswith("Doesn't have "):
-                    feature = "Không: " + aria[13:].strip()
-                elif aria.startswith("No "):
-                    feature = "Không: " + aria[3:].strip()
-                elif aria.startswith("Accepts "):
-                    feature = "Có: " + aria[8:].strip()
-                elif aria.startswith("Good for "):
-                    feature = "Có: " + aria
-                elif aria.startswith("Picnic"): 
-                    feature = "Có: " + aria
-                elif aria.startswith("Wifi"):
-                    feature = "Có: " + aria
-                elif aria.startswith("Toilet"):
-                    feature = "Có: " + aria
-                elif aria.startswith("Restroom"):
-                    feature = "Có: " + aria
-                elif aria.startswith("Parking"):
-                    feature = "Có: " + aria
-                elif aria.startswith("Wheelchair"):
+                m = _FEATURE_RE.match(aria)
+                if m:
+                    if m.lastgroup == 'yes':
+                        feature = "Có: " + aria[m.end():].strip()
+                    else:
+                        feature = "Không: " + aria[m.end():].strip()
+                elif aria.startswith(_BARE_POS_PREFIXES):
                     feature = "Có: " + aria
 
-                if feature and feature not in seen and len(feature) > 5:
+                if feature and len(feature) > 5 and feature not in seen:
                     seen.add(feature)
                     features.append(feature)
             
-            # Strategy 1: Selenium
-            try:
-                elements = self.driver.find_elements(By.CSS_SELECTOR, "[aria-label]")
-                for elem in elements:
-                    try:
-                        aria = elem.get_attribute("aria-label")
-                        add_feature(aria)
-                    except:
-                        continue
-            except:
-                pass
-            
-            # Strategy 2: BeautifulSoup
-            try:
-                soup = BeautifulSoup(self.driver.page_source, 'html.parser')
-                
-                for elem in soup.find_all(attrs={'aria-label': True}):
-                    aria = elem.get('aria-label', '')
-                    add_feature(aria)
-                
-                for li in soup.find_all('li'):
-                    aria = li.get('aria-label', '')
-                    if aria:
-                        add_feature(aria)
-                    for child in li.find_all(['span', 'div']):
-                        aria = child.get('aria-label', '')
-                        if aria:
-                            add_feature(aria)
-                
-                for item in soup.find_all(attrs={'role': 'listitem'}):
-                    aria = item.get('aria-label', '')
-                    if aria:
-                        add_feature(aria)
-                    for child in item.find_all(attrs={'aria-label': True}):
-                        add_feature(child.get('aria-label', ''))
-                
-                for img in soup.find_all('img', attrs={'aria-label': True}):
-                    aria = img.get('aria-label', '')
-                    add_feature(aria)
-                    
-            except:
-                pass
-            
-            # Strategy 3: Tìm theo pattern class
-            try:
-                feature_divs = self.driver.find_elements(By.CSS_SELECTOR, "div[class*='iNvpkc'], li[class*='hpLkke']")
-                for div in feature_divs:
-                    try:
-                        aria = div.get_attribute("aria-label")
-                        if aria:
+            # 1 lượt XPath duy nhất lấy mọi aria-label trong panel place
+            # (đã bao gồm li, listitem, img và các item iNvpkc/hpLkke).
+            # Panel không ra feature nào -> quét cả page_source như bản cũ
+            for get_html in (self._place_panel_html, lambda: self.driver.page_source):
+                try:
+                    html_frag = get_html()
+                    if html_frag:
+                        tree = lxml.html.fromstring(html_frag)
+                        for aria in tree.xpath('//*[@aria-label]/@aria-label'):
                             add_feature(aria)
-                        children = div.find_elements(By.CSS_SELECTOR, "[aria-label]")
-                        for child in children:
-                            add_feature(child.get_attribute("aria-label"))
-                    except:
-                        continue
-            except:
-                pass
+                except:
+                    pass
+                if features:
+                    break
             
         except Exception as e:
-            print(f"   [WARNING] About error: {e}")
+            logger.warning(f"[WARNING] About error: {e}")
         
         return features if features else None
 
@@ -449,7 +698,7 @@ class GoogleMapsScraper:
             for tab in tabs:
                 if any(x in tab.text.lower() for x in ["đánh giá", "review"]):
                     tab.click()
-                    time.sleep(1.5)
+                    self._wait_for("div[data-review-id]", 3)
                     break
             
             # Scroll để load reviews
@@ -489,14 +738,14 @@ class GoogleMapsScraper:
                         continue
                         
             except Exception as e:
-                print(f"   [WARNING] Click 'Thêm' error: {e}")
+                logger.warning(f"[WARNING] Click 'Thêm' error: {e}")
             
             # Đợi content expand
             time.sleep(0.5)
             
             # Parse reviews sau khi đã expand
-            soup = BeautifulSoup(self.driver.page_source, 'html.parser')
-            review_divs = soup.find_all('div', {'data-review-id': True})
+            soup = self._snapshot()
+            review_divs = soup.select('div[data-review-id]')
             
             seen = set()
             for div in review_divs:
@@ -505,25 +754,25 @@ class GoogleMapsScraper:
                     seen.add(rid)
                     try:
                         # Author
-                        author_elem = div.find('div', class_=lambda x: x and 'd4r55' in str(x))
+                        author_elem = div.select_one('div.d4r55')
                         author = author_elem.text.strip() if author_elem else "Anonymous"
                         
                         # Rating
-                        rating_elem = div.find('span', {'role': 'img', 'aria-label': True})
+                        rating_elem = div.select_one("span[role='img'][aria-label]")
                         rating_text = rating_elem.get('aria-label', '') if rating_elem else ''
-                        rating_match = re.search(r'(\d+)', rating_text)
+                        rating_match = _INT_RE.search(rating_text)
                         rating = float(rating_match.group(1)) if rating_match else 0.0
                         
                         # Text - lấy từ span.wiI7pd (đã được expand)
-                        text_elem = div.find('span', class_=lambda x: x and 'wiI7pd' in str(x))
+                        text_elem = div.select_one('span.wiI7pd')
                         text = text_elem.text.strip() if text_elem else ""
                         
                         # Date
-                        time_elem = div.find('span', class_=lambda x: x and 'rsqaWe' in str(x))
+                        time_elem = div.select_one('span.rsqaWe')
                         date = None
                         if time_elem:
                             time_text = time_elem.text.strip()
-                            date = self._convert_relative_date(time_text)
+                            date = convert_relative_date(time_text)
                         
                         if text and len(text) > 5:
                             comments.append({
@@ -542,76 +791,59 @@ class GoogleMapsScraper:
         
         return comments
     
-    def _convert_relative_date(self, relative_time: str) -> Optional[str]:
-        """Convert '3 tháng trước' -> '03/09/2024'"""
-        if not relative_time:
-            return None
-        
-        from datetime import timedelta
-        now = datetime.now()
-        text = relative_time.lower()
-        
-        try:
-            num_match = re.search(r'(\d+)', text)
-            num = int(num_match.group(1)) if num_match else 1
-            
-            if any(x in text for x in ['day', 'ngày', 'ngay']):
-                date = now - timedelta(days=num)
-            elif any(x in text for x in ['week', 'tuần', 'tuan']):
-                date = now - timedelta(weeks=num)
-            elif any(x in text for x in ['month', 'tháng', 'thang']):
-                date = now - timedelta(days=num * 30)
-            elif any(x in text for x in ['year', 'năm', 'nam']):
-                date = now - timedelta(days=num * 365)
-            else:
-                return None
-            
-            return date.strftime("%d/%m/%Y")
-        except:
-            return None
-
-    def _get_hours(self) -> Optional[dict]:
+    def _get_hours(self, data: Optional[dict] = None) -> Optional[dict]:
         """
         Lấy opening hours từ T2 - CN
         
+        Args:
+            data: kết quả _extract_basic - nếu table giờ đã có sẵn trong DOM thì không cần click
+        
         Returns:
             dict: {"Thứ Hai": "08:00-17:00", ...} hoặc None
         """
         result = {}
         
+        for day_name, hours_text in (data or {}).get("hours") or []:
+            if day_name and hours_text:
+                result[_canon_day(day_name)] = _clean_hours_text(hours_text)
+        if result:
+            return result
+        
         try:
             # Step 1: Click button giờ mở cửa để mở dropdown
             try:
                 hour_btn = self.driver.find_element(By.CSS_SELECTOR, "button[data-item-id='oh']")
                 if hour_btn.get_attribute("aria-expanded") != "true":
                     hour_btn.click()
-                    time.sleep(1.2)
+                    self._wait_for("table.eK4R0e", 2)
             except:
                 # Fallback: tìm button có chứa text giờ
                 try:
                     buttons = self.driver.find_elements(By.CSS_SELECTOR, "button[aria-label*='Đang mở'], button[aria-label*='Đã đóng']")
                     for btn in buttons:
                         btn.click()
-                        time.sleep(1.2)
+                        self._wait_for("table.eK4R0e", 2)
                         break
                 except:
                     pass
             
-            # Step 2: Parse table giờ mở cửa
-            soup = BeautifulSoup(self.driver.page_source, 'html.parser')
-            
-            # Tìm table chứa giờ (class eK4R0e)
-            table = soup.find('table', class_=lambda x: x and 'eK4R0e' in str(x))
+            # Step 2: Parse table giờ mở cửa (class eK4R0e)
+            # Chỉ lấy outerHTML của table (~vài KB) thay vì parse cả page_source
+            table = None
+            html_frag = self._outer_html('table.eK4R0e')
+            if html_frag:
+                from bs4 import BeautifulSoup
+                table = BeautifulSoup(html_frag, 'lxml').select_one('table.eK4R0e')
             
             if table:
-                rows = table.find_all('tr', class_=lambda x: x and 'y0skZc' in str(x))
+                rows = table.select('tr.y0skZc')
                 
                 for row in rows:
                     # Lấy tên ngày từ td.ylH6lf
-                    day_td = row.find('td', class_=lambda x: x and 'ylH6lf' in str(x))
+                    day_td = row.select_one('td.ylH6lf')
                     
                     # Lấy giờ từ td.mxowUb
-                    time_td = row.find('td', class_=lambda x: x and 'mxowUb' in str(x))
+                    time_td = row.select_one('td.mxowUb')
                     
                     if day_td and time_td:
                         day_name = day_td.get_text(strip=True)
@@ -621,7 +853,7 @@ class GoogleMapsScraper:
                         
                         # Fallback: lấy từ li.G8aQO
                         if not hours_text:
-                            li = time_td.find('li', class_=lambda x: x and 'G8aQO' in str(x))
+                            li = time_td.select_one('li.G8aQO')
                             if li:
                                 hours_text = li.get_text(strip=True)
                         
@@ -630,10 +862,7 @@ class GoogleMapsScraper:
                             hours_text = time_td.get_text(strip=True)
                         
                         if day_name and hours_text:
-                            # Clean format: "08:00 đến 17:00" -> "08:00-17:00"
-                            hours_text = hours_text.replace(' đến ', '-').replace('đến', '-')
-                            hours_text = hours_text.replace('–', '-')  # en-dash -> hyphen
-                            result[day_name] = hours_text
+                            result[_canon_day(day_name)] = _clean_hours_text(hours_text)
             
             # Step 3: Fallback - Selenium trực tiếp nếu BeautifulSoup fail
             if not result:
@@ -645,131 +874,117 @@ class GoogleMapsScraper:
                         
                         day_name = day_td.text.strip()
                         hours_text = time_td.get_attribute("aria-label") or time_td.text.strip()
-                        hours_text = hours_text.replace(' đến ', '-').replace('đến', '-').replace('–', '-')
                         
                         if day_name and hours_text:
-                            result[day_name] = hours_text
+                            result[_canon_day(day_name)] = _clean_hours_text(hours_text)
                 except:
                     pass
                     
         except Exception as e:
-            print(f"   [WARNING] Hours error: {e}")
+            logger.warning(f"[WARNING] Hours error: {e}")
         
         return result if result else None
 
-    def _get_images(self) -> List[str]:
+    def _get_images(self, max_images: int = 3) -> List[str]:
         images = []
         try:
+            img_css = "img[src*='googleusercontent.com'], img[src*='ggpht.com']"
             tabs = self.driver.find_elements(By.CSS_SELECTOR, "button[role='tab']")
             for tab in tabs:
                 if any(x in tab.text.lower() for x in ["photo", "hình", "ảnh"]):
+                    # Trang chính đã có sẵn ảnh đại diện -> đợi gallery thêm ảnh mới, không sleep cố định
+                    before = len(self.driver.find_elements(By.CSS_SELECTOR, img_css))
                     tab.click()
-                    time.sleep(1.5)
+                    try:
+                        WebDriverWait(self.driver, 2).until(
+                            lambda d: len(d.find_elements(By.CSS_SELECTOR, img_css)) > before)
+                    except TimeoutException:
+                        pass
                     break
             
-            for _ in range(2):
-                self.driver.execute_script("window.scrollBy(0, 300)")
-                time.sleep(0.3)
-            
-            imgs = self.driver.find_elements(By.TAG_NAME, "img")
             seen = set()
             
-            for img in imgs:
-                try:
-                    src = img.get_attribute("src")
+            def collect():
+                # Lấy src của tất cả <img> trong 1 lần execute_script
+                for src in self.driver.execute_script("return Array.from(document.images, i => i.src);"):
                     if src and ("googleusercontent.com" in src or "ggpht.com" in src) and "=w" in src:
                         if any(x in src for x in ["=w30", "=w48", "=w24", "=w32", "=w64", "=w36"]):
                             continue
                         
-                        match = re.search(r'=w(\d+)', src)
+                        match = _IMG_SIZE_RE.search(src)
                         if match and int(match.group(1)) >= 100:
                             base = src.split('=w')[0]
                             if base not in seen:
                                 seen.add(base)
                                 images.append(src)
-                                if len(images) >= 3:
-                                    break
-                except:
-                    continue
+                                if len(images) >= max_images:
+                                    return
+            
+            # Scroll tới khi đủ max_images hoặc scroll không load thêm ảnh mới
+            collect()
+            for _ in range(self.MAX_IMAGE_SCROLLS):
+                if len(images) >= max_images:
+                    break
+                before = len(images)
+                self.driver.execute_script("window.scrollBy(0, 300)")
+                time.sleep(0.3)
+                collect()
+                if len(images) == before:
+                    break
         except:
             pass
         
         return images
 
-    def _get_rating(self) -> Tuple[Optional[float], Optional[int]]:
+    def _get_rating(self, data: dict) -> Tuple[Optional[float], Optional[int]]:
         rating = None
         count = None
         
-        try:
-            elem = self.driver.find_element(By.CSS_SELECTOR, "span[aria-label*='sao']")
-            text = elem.get_attribute("aria-label")
-            m = re.search(r'(\d+[,.]?\d*)\s*sao', text)
+        text = data.get("rating_sao")
+        if text:
+            m = _RATING_SAO_RE.search(text)
             if m:
                 rating = float(m.group(1).replace(',', '.'))
-            m = re.search(r'(\d+[\.,]?\d*)\s*đánh giá', text)
+            m = _DANH_GIA_RE.search(text)
             if m:
                 count = int(m.group(1).replace('.', '').replace(',', ''))
-        except:
-            pass
         
         if rating is None:
-            try:
-                elem = self.driver.find_element(By.CSS_SELECTOR, "span[aria-label*='star']")
-                text = elem.get_attribute("aria-label")
-                m = re.search(r'(\d+[,.]?\d*)\s*star', text)
+            text = data.get("rating_star")
+            if text:
+                m = _STAR_RE.search(text)
                 if m:
                     rating = float(m.group(1).replace(',', '.'))
-                m = re.search(r'(\d+[\.,]?\d*)\s*review', text)
+                m = _REVIEW_RE.search(text)
                 if m:
                     count = int(m.group(1).replace('.', '').replace(',', ''))
-            except:
-                pass
         
         if rating is None:
-            try:
-                divs = self.driver.find_elements(By.CSS_SELECTOR, "div.fontDisplayLarge")
-                for div in divs:
-                    text = div.text.strip()
-                    if re.match(r'^\d+[,.]?\d*$', text):
-                        val = float(text.replace(',', '.'))
-                        if 1.0 <= val <= 5.0:
-                            rating = val
-                            break
-            except:
-                pass
+            for text in data.get("rating_big") or []:
+                if _RATING_NUM_RE.match(text):
+                    val = float(text.replace(',', '.'))
+                    if 1.0 <= val <= 5.0:
+                        rating = val
+                        break
         
         if count is None:
-            try:
-                buttons = self.driver.find_elements(By.CSS_SELECTOR, "button")
-                for btn in buttons:
-                    m = re.search(r'\((\d{1,3}(?:[,\.]\d{3})*)\)', btn.text)
-                    if m:
-                        count = int(m.group(1).replace(',', '').replace('.', ''))
-                        break
-            except:
-                pass
+            for text in data.get("count_texts") or []:
+                m = _BTN_COUNT_RE.search(text)
+                if m:
+                    count = int(m.group(1).replace(',', '').replace('.', ''))
+                    break
         
         return rating, count
 
-    def _get_category(self) -> Optional[str]:
-        try:
-            buttons = self.driver.find_elements(By.CSS_SELECTOR, "button[jsaction*='category']")
-            for btn in buttons:
-                text = btn.text.strip()
-                if text and 3 < len(text) < 50:
-                    return text
-        except:
-            pass
-        
-        try:
-            btn = self.driver.find_element(By.CSS_SELECTOR, "button.DkEaL")
-            return btn.text.strip()
-        except:
-            pass
+    def _get_category(self, data: dict) -> Optional[str]:
+        for text in data.get("category") or []:
+            if text and 3 < len(text) < 50:
+                return text
         
-        return None
+        return data.get("category_alt")
 
-    def scrape_place(self, name: str, address: str, lat: float, lon: float, num_reviews: int = 3) -> dict:
+    def scrape_place(self, name: str, address: str, lat: float, lon: float, num_reviews: int = 3,
+                     max_images: int = 3) -> dict:
         if not self.driver:
             self.init_driver()
 
@@ -795,105 +1010,315 @@ class GoogleMapsScraper:
         try:
             query = urllib.parse.quote(address)
             url = f"https://www.google.com/maps/search/{query}"
+            # Viewport quanh toạ độ trong CSV: search ra thẳng trang place thường hơn,
+            # đỡ phải qua nhánh chọn chi nhánh bên dưới
+            if lat and lon:
+                url += f"/@{lat},{lon},17z"
 
-            print(f"   [SEARCH] {address[:50]}...")
+            logger.info(f"[SEARCH] {address[:50]}...")
             self.driver.get(url)
-            time.sleep(4)
+            # Đợi redirect sang trang place hoặc danh sách kết quả thay vì sleep cố định
+            try:
+                WebDriverWait(self.driver, 8).until(
+                    lambda d: _PLACE_PAGE_URL_RE.search(d.current_url)
+                    or d.find_elements(By.CSS_SELECTOR, "a[href*='/place/']"))
+            except TimeoutException:
+                pass
 
             current_url = self.driver.current_url
             result["google_maps_url"] = current_url
 
             # Handle chain/search
-            if "/search/" in current_url or not re.search(r'/place/[^/]+/@', current_url):
+            if "/search/" in current_url or not _PLACE_PAGE_URL_RE.search(current_url):
                 try:
                     wait = WebDriverWait(self.driver, 5)
                     links = wait.until(EC.presence_of_all_elements_located((By.CSS_SELECTOR, "a[href*='/place/']")))
 
                     if links:
-                        best_score = 0
-                        best_link = None
-                        query_norm = normalize_place_name(name)
-
-                        for link in links[:10]:
-                            try:
-                                href = link.get_attribute("href")
-                                cand = extract_name_from_google_maps_url(href)
-                                if cand:
-                                    cand_norm = normalize_place_name(cand)
-                                    score = max(fuzz.ratio(query_norm, cand_norm), fuzz.token_set_ratio(query_norm, cand_norm))
-                                    if score > best_score:
-                                        best_score = score
-                                        best_link = link
-                            except:
-                                continue
-
-                        if best_link and best_score >= 50:
-                            best_link.click()
-                            time.sleep(2.5)
-                            result["google_maps_url"] = self.driver.current_url
-                        elif links:
-                            links[0].click()
-                            time.sleep(2.5)
-                            result["google_maps_url"] = self.driver.current_url
+                        # 1 lần execute_script lấy href của 10 kết quả đầu thay vì 10 RPC get_attribute
+                        hrefs = self.driver.execute_script(_PLACE_HREFS_JS, 10) or []
+                        best_idx = _pick_best_candidate(normalize_place_name(name), hrefs)
+
+                        if best_idx is None or best_idx >= len(links):
+                            best_idx = 0
+                        links[best_idx].click()
+                        self._wait_for_place_url()
+                        result["google_maps_url"] = self.driver.current_url
                 except:
                     pass
 
             # === SCRAPE DATA TỪ TRANG CHÍNH ===
+            # Panel place đã render khi có thanh tab (Tổng quan/Đánh giá/Giới thiệu)
+            self._wait_for("button[role='tab']", 3)
+            # 1 lần execute_script cho tất cả field trên trang chính (chưa click tab nào)
+            data = self._extract_basic()
             
-            rating, count = self._get_rating()
+            rating, count = self._get_rating(data)
             result["rating"] = rating
             result["rating_count"] = count
             if rating:
-                print(f"   [OK] Rating: {rating} ({count} reviews)")
+                logger.info(f"[OK] Rating: {rating} ({count} reviews)")
             
-            result["category"] = self._get_category()
+            result["category"] = self._get_category(data)
             if result["category"]:
-                print(f"   [OK] Category: {result['category']}")
+                logger.info(f"[OK] Category: {result['category']}")
             
-            result["price_level"] = self._get_price_level()
+            result["price_level"] = self._get_price_level(data)
             
-            result["new_address"] = self._get_address()
+            result["new_address"] = self._get_address(data)
             if result["new_address"]:
-                print(f"   [OK] Address: {result['new_address'][:40]}...")
+                logger.info(f"[OK] Address: {result['new_address'][:40]}...")
             
-            result["phone"] = self._get_phone()
+            result["phone"] = self._get_phone(data)
             if result["phone"]:
-                print(f"   [OK] Phone: {result['phone']}")
+                logger.info(f"[OK] Phone: {result['phone']}")
             
-            result["website"] = self._get_website()
+            result["website"] = self._get_website(data)
             if result["website"]:
-                print(f"   [OK] Website")
+                logger.info(f"[OK] Website")
             
             # Opening hours - NEW!
-            result["opening_hours"] = self._get_hours()
+            result["opening_hours"] = self._get_hours(data)
             if result["opening_hours"]:
-                print(f"   [OK] Hours: {len(result['opening_hours'])} days")
+                logger.info(f"[OK] Hours: {len(result['opening_hours'])} days")
             
             # === SCRAPE DATA TỪ TABS ===
             
-            result["images"] = self._get_images()
-            print(f"   [OK] Images: {len(result['images'])}")
+            # max_images=0: bỏ qua hẳn tab ảnh
+            result["images"] = self._get_images(max_images) if max_images > 0 else []
+            logger.info(f"[OK] Images: {len(result['images'])}")
             
             result["about"] = self._get_about()
             if result["about"]:
-                print(f"   [OK] About: {len(result['about'])} features")
+                logger.info(f"[OK] About: {len(result['about'])} features")
             
             result["comments"] = self._get_comments(num_reviews)
-            print(f"   [OK] Comments: {len(result['comments'])}")
+            logger.info(f"[OK] Comments: {len(result['comments'])}")
 
         except Exception as e:
-            print(f"   [ERROR] {e}")
+            logger.error(f"[ERROR] {name}: {e}")
 
         return result
 
+    def _driver_rss(self) -> int:
+        """Tổng RSS (bytes) của chromedriver + các process Chrome con, 0 nếu không đo được"""
+        if psutil is None or not self.driver:
+            return 0
+        try:
+            proc = psutil.Process(self.driver.service.process.pid)
+            total = proc.memory_info().rss
+            for child in proc.children(recursive=True):
+                try:
+                    total += child.memory_info().rss
+                except psutil.Error:
+                    pass
+            return total
+        except:
+            return 0
+
+    def restart_if_needed(self):
+        """Gọi sau mỗi place - đóng Chrome khi đủ RESTART_EVERY place hoặc RSS > MAX_RSS_BYTES.
+        scrape_place tự init_driver lại ở place kế tiếp."""
+        if not self.driver:
+            return
+        self.places_since_restart += 1
+        if self.places_since_restart >= self.RESTART_EVERY:
+            logger.info(f"[RESTART] Chrome sau {self.places_since_restart} places")
+        else:
+            rss = self._driver_rss()
+            if rss <= self.MAX_RSS_BYTES:
+                return
+            logger.warning(f"[RESTART] Chrome RSS {rss // (1 << 20)} MB")
+        try:
+            self.close()
+        except:
+            pass
+
     def close(self):
-        if self.driver:
-            self.driver.quit()
+        try:
+            if self.driver:
+                self.driver.quit()
+        finally:
             self.driver = None
 
+    def shutdown(self):
+        """Đóng Chrome + xoá disk cache - gọi 1 lần khi scraper không dùng nữa"""
+        try:
+            self.close()
+        finally:
+            if self.cache_dir:
+                _remove_dir(self.cache_dir)
+                self.cache_dir = None
+
+
+def _cache_dir_prefix(pid: int) -> str:
+    return f"gmaps_cache_{pid}_"
+
+
+def _remove_dir(path: str) -> None:
+    """rmtree, thử lại vài lần - trên Windows process Chrome con nhả file chậm sau quit()"""
+    for _ in range(10):
+        try:
+            shutil.rmtree(path)
+            return
+        except FileNotFoundError:
+            return
+        except OSError:
+            time.sleep(0.5)
+    shutil.rmtree(path, ignore_errors=True)
+
+
+def _write_json(path: str, data) -> None:
+    """json.dump qua buffer 1MB - output nhiều comments, ghi 8KB/lần chậm trên HDD/NAS"""
+    with open(path, 'wb') as raw, \
+            io.BufferedWriter(raw, buffer_size=1 << 20) as buf, \
+            io.TextIOWrapper(buf, encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+def _jsonl_to_json(jsonl_path: str, path: str) -> int:
+    """Ghép file JSONL thành 1 JSON array (cùng format json.dump indent=2), đọc từng dòng -
+    không giữ toàn bộ kết quả trong RAM. Trả về số record."""
+    n = 0
+    with open(jsonl_path, 'r', encoding='utf-8') as src, \
+            open(path, 'wb') as raw, \
+            io.BufferedWriter(raw, buffer_size=1 << 20) as buf, \
+            io.TextIOWrapper(buf, encoding='utf-8') as f:
+        f.write('[')
+        for line in src:
+            if not line.strip():
+                continue
+            text = json.dumps(json.loads(line), ensure_ascii=False, indent=2)
+            f.write((',\n  ' if n else '\n  ') + text.replace('\n', '\n  '))
+            n += 1
+        f.write('\n]' if n else ']')
+    return n
+
+
+# Scraper của process hiện tại khi chạy trong Pool (gán bởi _init_worker)
+_worker_scraper = None
+
+
+def _attach_log_queue(log_queue) -> None:
+    """Gửi log của logger "scraper" vào queue - QueueListener ở process chính ghi ra file/console"""
+    logger.handlers[:] = [logging.handlers.QueueHandler(log_queue)]
+
+
+def _start_logging(log_file: str):
+    """Tạo queue + QueueListener (file log đầy đủ, console chỉ WARNING). Trả về (queue, listener)"""
+    log_queue = Queue()
+    file_handler = logging.FileHandler(log_file, encoding='utf-8', delay=True)
+    file_handler.setFormatter(logging.Formatter('%(asctime)s %(processName)s %(levelname)s %(message)s'))
+    console = logging.StreamHandler(sys.stdout)
+    console.setLevel(logging.WARNING)
+    console.setFormatter(logging.Formatter('%(message)s'))
+    listener = logging.handlers.QueueListener(log_queue, file_handler, console, respect_handler_level=True)
+    listener.start()
+    _attach_log_queue(log_queue)
+    return log_queue, listener
+
+
+def _close_worker_on_sigterm(signum, frame):
+    """SIGTERM handler của worker - quit Chrome rồi thoát ngay"""
+    try:
+        if _worker_scraper is not None:
+            _worker_scraper.shutdown()
+    except:
+        pass
+    finally:
+        os._exit(1)
+
+
+def _worker_descendants(workers: list) -> list:
+    """chromedriver + Chrome (process con của các worker Pool), rỗng nếu không có psutil"""
+    procs = []
+    if psutil is None:
+        return procs
+    for w in workers:
+        try:
+            procs.extend(psutil.Process(w.pid).children(recursive=True))
+        except psutil.Error:
+            pass
+    return procs
+
+
+def _init_worker(headless: bool, log_queue=None):
+    """Initializer của Pool - mỗi process giữ 1 Chrome dùng cho tất cả place (Selenium không thread-safe)"""
+    global _worker_scraper
+    if log_queue is not None:
+        _attach_log_queue(log_queue)
+    # pool.terminate() gửi SIGTERM -> Finalize không chạy, phải tự đóng Chrome trước khi thoát
+    if sys.platform != 'win32':
+        signal.signal(signal.SIGTERM, _close_worker_on_sigterm)
+    _worker_scraper = GoogleMapsScraper(headless=headless)
+    # Đóng Chrome khi worker process thoát
+    Finalize(None, _worker_scraper.shutdown, exitpriority=10)
+
+
+def _scrape_one(p: dict, max_images: int = 3) -> Tuple[dict, Optional[dict], Optional[str]]:
+    """Worker của Pool - trả về (place, result, error)"""
+    # Jitter để các worker không gửi request tới Google cùng lúc
+    time.sleep(random.uniform(0.5, 2.0))
+    try:
+        return p, _worker_scraper.scrape_place(p['name'], p['address'], p['lat'], p['lon'],
+                                               max_images=max_images), None
+    except Exception as e:
+        return p, None, str(e)
+    finally:
+        _worker_scraper.restart_if_needed()
+
+
+def _scrape_sequential(places: List[dict], headless: bool, start_index: int = 0, max_images: int = 3):
+    """Scrape tuần tự bằng 1 Chrome - yield (place, result, error)"""
+    scraper = GoogleMapsScraper(headless=headless)
+    try:
+        for i, p in enumerate(places, 1):
+            logger.info(f"[{start_index + i}/{start_index + len(places)}] {p['name']}")
+            try:
+                yield p, scraper.scrape_place(p['name'], p['address'], p['lat'], p['lon'],
+                                              max_images=max_images), None
+            except Exception as e:
+                yield p, None, str(e)
+            scraper.restart_if_needed()
+    finally:
+        scraper.shutdown()
+
+
+def _scrape_parallel(places: List[dict], headless: bool, workers: int, max_images: int = 3, log_queue=None):
+    """Scrape song song bằng Pool - yield (place, result, error) theo thứ tự hoàn thành"""
+    pool = Pool(processes=workers, initializer=_init_worker, initargs=(headless, log_queue))
+    try:
+        for i, (p, result, error) in enumerate(pool.imap_unordered(functools.partial(_scrape_one, max_images=max_images), places), 1):
+            logger.info(f"[DONE {i}/{len(places)}] {p['name']}")
+            yield p, result, error
+        pool.close()
+    except BaseException:
+        worker_procs = active_children()
+        procs = _worker_descendants(worker_procs)
+        pool.terminate()
+        # Windows: TerminateProcess bỏ qua SIGTERM handler -> kill Chrome còn sót lại
+        # và xoá disk cache mà worker không kịp xoá
+        for proc in procs:
+            try:
+                proc.kill()
+            except psutil.Error:
+                pass
+        for w in worker_procs:
+            for path in glob.glob(os.path.join(tempfile.gettempdir(), _cache_dir_prefix(w.pid) + "*")):
+                _remove_dir(path)
+        raise
+    finally:
+        pool.join()
+
 
 def scrape_csv_file(csv_file: str, output_file: str = None, headless: bool = True,
-                    start_index: int = 0, end_index: int = None) -> List[dict]:
+                    start_index: int = 0, end_index: int = None, workers: int = 1,
+                    max_images: int = 3) -> int:
+    """Scrape các place trong [start_index, end_index) của csv_file.
+
+    Kết quả ghi ra output_file (JSON array) + checkpoint output_file.jsonl, không giữ trong RAM.
+    Trả về số place scrape thành công - đọc output_file nếu cần danh sách record.
+    """
     if output_file is None:
         name = os.path.splitext(os.path.basename(csv_file))[0]
         if end_index is not None:
@@ -902,19 +1327,28 @@ def scrape_csv_file(csv_file: str, output_file: str = None, headless: bool = Tru
             output_file = os.path.join(os.path.dirname(csv_file), f"{name}_scraped_from_{start_index}.json")
         else:
             output_file = os.path.join(os.path.dirname(csv_file), f"{name}_scraped.json")
+    log_file = os.path.splitext(output_file)[0] + ".log"
 
     print("=" * 70)
     print("GOOGLE MAPS SCRAPER V5 - WITH OPENING HOURS")
     print("=" * 70)
     print(f"Input: {csv_file}")
     print(f"Output: {output_file}")
+    print(f"Log: {log_file}")
     print(f"Range: {start_index} -> {end_index or 'END'}")
-    print("=" * 70)
+    print(f"Workers: {workers}")
+    print("=" * 70, flush=True)
 
+    # Chỉ dựng dict + parse float cho các dòng trong [start_index, end_index)
     places = []
-    with open(csv_file, 'r', encoding='utf-8-sig') as f:
+    with open(csv_file, 'r', encoding='utf-8-sig', newline='') as f:
         reader = csv.DictReader(f)
-        for row in reader:
+        if start_index < 0 or (end_index is not None and end_index < 0):
+            # Index âm (vd: "0 -1") tính từ cuối file -> phải đọc hết rồi slice như list
+            rows = list(reader)[start_index:end_index]
+        else:
+            rows = itertools.islice(reader, start_index, end_index)
+        for row in rows:
             places.append({
                 'place_id': row['place_id'],
                 'name': row['name'],
@@ -924,71 +1358,104 @@ def scrape_csv_file(csv_file: str, output_file: str = None, headless: bool = Tru
                 'type': row['type']
             })
 
-    if end_index is not None:
-        places = places[start_index:end_index]
-    else:
-        places = places[start_index:]
+    print(f"[OK] Loaded {len(places)} places\n", flush=True)
 
-    print(f"[OK] Loaded {len(places)} places\n")
+    # Chỉ đếm trong RAM - kết quả đầy đủ nằm trong file JSONL
+    n_done = 0
+    # Checkpoint: mỗi place 1 dòng JSONL, file .json đầy đủ ghép từ JSONL 1 lần ở cuối
+    jsonl_file = output_file + ".jsonl"
+    fjsonl = open(jsonl_file, 'w', encoding='utf-8', buffering=1 << 20)
 
-    scraper = GoogleMapsScraper(headless=headless)
-    data = []
+    log_queue, listener = _start_logging(log_file)
+    if workers > 1:
+        results = _scrape_parallel(places, headless, workers, max_images, log_queue)
+    else:
+        results = _scrape_sequential(places, headless, start_index, max_images)
 
     try:
-        for i, p in enumerate(places, 1):
-            print(f"\n[{start_index + i}/{start_index + len(places)}] {p['name']}")
-            print("-" * 50)
-
-            try:
-                result = scraper.scrape_place(p['name'], p['address'], p['lat'], p['lon'])
-                result['place_id'] = p['place_id']
-                result['type'] = p['type']
-                result['scraped_at'] = datetime.now().isoformat()
-                data.append(result)
-
-                if i % 10 == 0:
-                    with open(output_file, 'w', encoding='utf-8') as f:
-                        json.dump(data, f, ensure_ascii=False, indent=2)
-                    print(f"\n[SAVE] {len(data)} places")
-            except Exception as e:
-                print(f"[ERROR] {e}")
+        for i, (p, result, error) in enumerate(results, 1):
+            if error:
+                logger.error(f"[ERROR] {p['name']}: {error}")
                 continue
 
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+            result['place_id'] = p['place_id']
+            result['type'] = p['type']
+            result['scraped_at'] = time.strftime('%Y-%m-%dT%H:%M:%S')
+            fjsonl.write(json.dumps(result, ensure_ascii=False) + "\n")
+            n_done += 1
 
-        print(f"\n[SUCCESS] {len(data)}/{len(places)} places")
-        print(f"Output: {output_file}")
-
-        return data
+            if i % 10 == 0:
+                fjsonl.flush()
+                print(f"[SAVE] {n_done} places -> {jsonl_file}", flush=True)
+    except KeyboardInterrupt:
+        print(f"\n[INTERRUPTED] Saving {n_done} places -> {output_file}", flush=True)
+        raise
     finally:
-        scraper.close()
+        # Mọi đường thoát (xong, Ctrl+C, exception) đều ghép lại .json từ JSONL
+        try:
+            fjsonl.close()
+            _jsonl_to_json(jsonl_file, output_file)
+        except Exception as e:
+            logger.error(f"[ERROR] Write {output_file}: {e} (dữ liệu vẫn còn trong {jsonl_file})")
+        results.close()
+        listener.stop()
+        logger.handlers[:] = [_default_log_handler]
+
+    print(f"\n[SUCCESS] {n_done}/{len(places)} places")
+    print(f"Output: {output_file}", flush=True)
+
+    return n_done
+
+
+def _read_jsonl(path: str) -> List[dict]:
+    """Đọc checkpoint JSONL - bỏ qua dòng cuối bị cắt dở khi process bị kill"""
+    records = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                pass
+    return records
 
 
 def merge_files(directory: str, output: str = None, pattern: str = "*_scraped_*.json"):
-    import glob
-    
-    files = glob.glob(os.path.join(directory, pattern))
+    files = set(glob.glob(os.path.join(directory, pattern)))
+    # Run bị kill chỉ còn checkpoint .jsonl -> dùng nó khi .json thiếu hoặc cũ hơn
+    for jl in glob.glob(os.path.join(directory, pattern + ".jsonl")):
+        base = jl[:-len(".jsonl")]
+        if base in files and os.path.getmtime(base) >= os.path.getmtime(jl):
+            continue
+        files.discard(base)
+        files.add(jl)
     if not files:
         print(f"No files found")
         return
     
     all_data = []
     for f in sorted(files):
-        with open(f, 'r', encoding='utf-8') as file:
-            all_data.extend(json.load(file))
-            print(f"  {os.path.basename(f)}: {len(json.load(open(f, encoding='utf-8')))}")
-    
+        if f.endswith(".jsonl"):
+            d = _read_jsonl(f)
+        else:
+            with open(f, 'r', encoding='utf-8') as file:
+                d = json.load(file)
+        all_data.extend(d)
+        print(f"  {os.path.basename(f)}: {len(d)}")
+
     seen = set()
-    unique = [x for x in all_data if x.get('place_id') not in seen and not seen.add(x.get('place_id'))]
+    unique = []
+    for x in all_data:
+        pid = x.get('place_id')
+        if pid not in seen:
+            seen.add(pid)
+            unique.append(x)
     
     if output is None:
         output = os.path.join(directory, "merged.json")
     
-    with open(output, 'w', encoding='utf-8') as f:
-        json.dump(unique, f, ensure_ascii=False, indent=2)
+    _write_json(output, unique)
     
-    print(f"\nMerged {len(unique)} places -> {output}")
+    print(f"\nMerged {len(unique)} places -> {output}", flush=True)
 
 
 def main():